@@ -1,9 +1,38 @@
+import os
+
 import streamlit as st
+import streamlit.components.v1 as components
+import numpy as np
 import pandas as pd
 import folium
 from folium import CircleMarker
-from streamlit_folium import st_folium
-from geopy.distance import geodesic
+from folium.plugins import FastMarkerCluster
+
+from data import (
+    NRC_COLUMNS,
+    NRC_FILE,
+    WORKSHOP_COLUMNS,
+    WORKSHOPS_FILE,
+    load_saved_coverage_index,
+    read_workbooks,
+)
+from geo import (
+    build_coverage_index,
+    coverage_index_matches,
+    project_km,
+    projection_origin,
+    squared_distance_matrix_km,
+    squared_distance_pairs_km,
+    totals_within,
+    totals_within_bbox,
+    totals_within_c,
+    totals_within_radius,
+)
+
+try:
+    from sklearn.neighbors import BallTree
+except ImportError:  # scikit-learn is optional; large inputs use the kernels in geo.py
+    BallTree = None
 
 # -----------------------------------------
 # PAGE CONFIGURATION
@@ -20,103 +49,184 @@ Use this to identify **coverage zones** and **potential workshop expansion areas
 # LOAD DATA
 # -----------------------------------------
 @st.cache_data
-def load_data():
-    workshops = pd.read_excel("KMA_Mahindra_Workshops_Lat_Long (1).xlsx")
-    nrc = pd.read_excel("KMA_NRC_F30_Retail_RO_Projections_PV_Lat_Long_Pincode (1).xlsx")
+def load_and_canonicalize(workshops_mtime, nrc_mtime):
+    """Canonical ``(workshops, nrc)`` frames, cached until either workbook changes."""
+    # The file mtimes are only cache keys: editing either workbook reloads it
+    return read_workbooks()
 
-    # Standardize column names
-    workshops.columns = workshops.columns.str.strip().str.lower()
-    nrc.columns = nrc.columns.str.strip().str.lower()
 
-    return workshops, nrc
-
-
-workshops, nrc = load_data()
+workshops, nrc = load_and_canonicalize(
+    os.path.getmtime(WORKSHOPS_FILE), os.path.getmtime(NRC_FILE)
+)
 
 # -----------------------------------------
 # VERIFY COLUMNS
 # -----------------------------------------
-expected_wk_headers = {"workshop name", "pincode", "lat", "lon"}
-expected_nrc_headers = {"customer pin code", "latitude", "longitude", "nrc vin count", "nrc_projected_ro_yearly"}
+missing_wk_headers = WORKSHOP_COLUMNS.difference(workshops.columns)
+missing_nrc_headers = NRC_COLUMNS.difference(nrc.columns)
 
-if not expected_wk_headers.issubset(set(workshops.columns)):
-    st.error(f"⚠ Workshop file missing columns: {expected_wk_headers - set(workshops.columns)}")
+if missing_wk_headers:
+    st.error(f"⚠ Workshop file missing columns: {missing_wk_headers}")
 
-if not expected_nrc_headers.issubset(set(nrc.columns)):
-    st.error(f"⚠ NRC file missing columns: {expected_nrc_headers - set(nrc.columns)}")
+if missing_nrc_headers:
+    st.error(f"⚠ NRC file missing columns: {missing_nrc_headers}")
 
 # -----------------------------------------
 # USER INPUT
 # -----------------------------------------
 radius_km = st.slider("Select radius (km)", min_value=1, max_value=20, value=5)
+show_points = st.checkbox("Show NRC projection points", value=True)
 
 # -----------------------------------------
 # CALCULATE NRC COVERAGE
 # -----------------------------------------
-results = []
-
-for _, wk in workshops.iterrows():
-    wk_lat, wk_lon = wk["lat"], wk["lon"]
-    wk_name = wk["workshop name"]
-    wk_pin = wk["pincode"]
-
-    # Compute distance for each NRC point
-    nrc["distance_km"] = nrc.apply(
-        lambda r: geodesic((wk_lat, wk_lon), (r["latitude"], r["longitude"])).km, axis=1
+# Above this many workshop/NRC pairs the cached dense distance matrix gets too
+# large to keep around, and the BallTree (or, without scikit-learn, the C or
+# numba kernel or a box-prefiltered NumPy scan) is queried per radius instead.
+# All paths compare the same float32 squared distance against r², so crossing
+# the threshold never changes the totals. The shipped data (~12 x 410 pairs)
+# always stays dense, so these backends only matter for much larger inputs.
+DENSE_MAX_PAIRS = 5_000_000
+
+# Pull the columns out once as flat arrays; the cached helpers and everything
+# below take these (Streamlit hashes NumPy arrays for the cache keys)
+ws_lat = workshops["lat"].to_numpy()
+ws_lon = workshops["lon"].to_numpy()
+nrc_lat = nrc["latitude"].to_numpy()
+nrc_lon = nrc["longitude"].to_numpy()
+vins = nrc["nrc vin count"].to_numpy()
+
+# Centre of the equirectangular km plane every backend measures in
+origin = projection_origin(ws_lat, ws_lon)
+
+
+@st.cache_resource
+def load_coverage_index(ws_lat, ws_lon, nrc_lat, nrc_lon, vins, origin):
+    """Sorted squared distances and cumulative VINs per workshop, built once per dataset.
+
+    Uses the memory-mapped output of ``precompute.py`` when it matches the
+    loaded data, so a warm start does no distance work at all.
+    """
+    saved = load_saved_coverage_index()
+    if saved is not None and coverage_index_matches(
+        *saved, ws_lat, ws_lon, nrc_lat, nrc_lon, vins
+    ):
+        return saved[:2]
+    dist_sq_km = squared_distance_matrix_km(
+        project_km(ws_lat, ws_lon, origin), project_km(nrc_lat, nrc_lon, origin)
     )
+    return build_coverage_index(dist_sq_km, vins)
+
+
+@st.cache_resource
+def build_nrc_tree(nrc_lat, nrc_lon, origin):
+    """Projected NRC points and a BallTree over them, built once per dataset."""
+    nrc_xy = project_km(nrc_lat, nrc_lon, origin)
+    return nrc_xy, BallTree(nrc_xy)
+
+
+dense = len(ws_lat) * len(nrc_lat) <= DENSE_MAX_PAIRS
+
+if not dense and BallTree is not None:
+    # Only visit the NRC points that are actually in range of each workshop,
+    # then sum all of them in one grouped reduction. The tree works in float64,
+    # so query a hair wide and keep the hits that pass the float32 d² <= r²
+    # test the other paths use.
+    nrc_xy, tree = build_nrc_tree(nrc_lat, nrc_lon, origin)
+    ws_xy = project_km(ws_lat, ws_lon, origin)
+    idx_lists = tree.query_radius(ws_xy, r=radius_km * (1 + 1e-6))
+    n_hits = np.fromiter(map(len, idx_lists), dtype=np.intp, count=len(idx_lists))
+    rows = np.repeat(np.arange(len(idx_lists)), n_hits)
+    cols = np.concatenate(idx_lists)
+    hit = squared_distance_pairs_km(ws_xy, nrc_xy, rows, cols) <= radius_km * radius_km
+    total_vins = np.bincount(
+        rows[hit], weights=vins[cols[hit]], minlength=len(idx_lists)
+    ).astype(np.int64)
+elif not dense:
+    ws_xy = project_km(ws_lat, ws_lon, origin)
+    nrc_xy = project_km(nrc_lat, nrc_lon, origin)
+    if totals_within_c is not None:
+        # Stream every pair through a compiled kernel without a W x P matrix
+        total_vins = totals_within_c(ws_xy, nrc_xy, vins, float(radius_km))
+    elif totals_within_radius is not None:
+        total_vins = totals_within_radius(ws_xy, nrc_xy, vins, float(radius_km))
+    else:
+        # Plain NumPy: bounding-box prefilter, exact distance on survivors only
+        total_vins = totals_within_bbox(ws_xy, nrc_xy, vins, radius_km)
+else:
+    # Distances don't depend on the slider, so a radius change is just a lookup
+    dist_sq_sorted, cum_vins = load_coverage_index(
+        ws_lat, ws_lon, nrc_lat, nrc_lon, vins, origin
+    )
+    total_vins = totals_within(dist_sq_sorted, cum_vins, radius_km)
 
-    # Filter NRCs within radius
-    nearby_nrc = nrc[nrc["distance_km"] <= radius_km]
-    total_vins = nearby_nrc["nrc vin count"].sum()
-
-    results.append({
-        "Workshop Name": wk_name,
-        "Workshop Pincode": wk_pin,
-        "Latitude": wk_lat,
-        "Longitude": wk_lon,
-        "Radius (km)": radius_km,
-        "NRC VINs within Radius": total_vins
-    })
-
-results_df = pd.DataFrame(results)
+results_df = pd.DataFrame({
+    "Workshop Name": workshops["workshop name"].to_numpy(),
+    "Workshop Pincode": workshops["pincode"].to_numpy(),
+    "Latitude": ws_lat,
+    "Longitude": ws_lon,
+    "Radius (km)": radius_km,
+    "NRC VINs within Radius": total_vins,
+})
 
 # -----------------------------------------
 # MAP VISUALIZATION
 # -----------------------------------------
 st.subheader("🗺️ Workshop NRC VIN Coverage Map")
 
-center_lat = workshops["lat"].mean()
-center_lon = workshops["lon"].mean()
-
-m = folium.Map(location=[center_lat, center_lon], zoom_start=7)
-
-# Add NRC points (gray)
-for _, r in nrc.iterrows():
-    CircleMarker(
-        location=[r["latitude"], r["longitude"]],
-        radius=2,
-        color="gray",
-        fill=True,
-        fill_opacity=0.3,
-        popup=f"Pincode: {r.get('customer pin code', '')}<br>NRC VINs: {int(r.get('nrc vin count', 0))}"
-    ).add_to(m)
-
-# Add workshops (blue bubbles proportional to VINs)
-for _, r in results_df.iterrows():
-    count = int(r["NRC VINs within Radius"])
-    size = max(5, min(count / 200, 25))  # Bubble scaling logic
-    CircleMarker(
-        location=[r["Latitude"], r["Longitude"]],
-        radius=size,
-        color="blue",
-        fill=True,
-        fill_opacity=0.6,
-        popup=f"<b>{r['Workshop Name']}</b><br>"
-              f"Pincode: {r['Workshop Pincode']}<br>"
-              f"VINs within {radius_km} km: {count}"
-    ).add_to(m)
-
-st_folium(m, width=1100, height=650)
+# Gray NRC point markers, created client-side by FastMarkerCluster
+NRC_POINT_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 2, color: "gray", fill: true, fillOpacity: 0.3
+    });
+    marker.bindPopup("Pincode: " + row[2] + "<br>NRC VINs: " + row[3]);
+    return marker;
+}
+"""
+
+
+@st.cache_data
+def build_map_html(results_df, nrc, radius_km, show_points):
+    """Render the coverage map to standalone HTML, cached per radius and dataset."""
+    center_lat = results_df["Latitude"].mean()
+    center_lon = results_df["Longitude"].mean()
+
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=7)
+
+    # NRC points (gray), clustered client-side so only what's on screen is drawn
+    if show_points:
+        nrc_points = list(zip(
+            nrc["latitude"].tolist(),
+            nrc["longitude"].tolist(),
+            nrc["customer pin code"].tolist(),
+            nrc["nrc vin count"].tolist(),
+        ))
+        FastMarkerCluster(data=nrc_points, callback=NRC_POINT_CALLBACK).add_to(m)
+
+    # Add workshops (blue bubbles proportional to VINs) as one layer
+    counts = results_df["NRC VINs within Radius"].to_numpy().astype(int)
+    sizes = np.clip(counts / 200, 5, 25)  # Bubble scaling logic
+    workshop_layer = folium.FeatureGroup(name="Workshops")
+    for (name, pincode, lat, lon, _, _), count, size in zip(
+        results_df.itertuples(index=False, name=None), counts, sizes
+    ):
+        workshop_layer.add_child(CircleMarker(
+            location=[lat, lon],
+            radius=float(size),
+            color="blue",
+            fill=True,
+            fill_opacity=0.6,
+            popup=f"<b>{name}</b><br>"
+                  f"Pincode: {pincode}<br>"
+                  f"VINs within {radius_km} km: {count}"
+        ))
+    m.add_child(workshop_layer)
+
+    return m.get_root().render()
+
+
+components.html(build_map_html(results_df, nrc, radius_km, show_points), height=650)
 
 # -----------------------------------------
 # SUMMARY TABLE
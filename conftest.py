@@ -0,0 +1 @@
+# Keeps the repository root importable (``import geo``) when running pytest.
@@ -0,0 +1,93 @@
+"""Reading the workshop/NRC workbooks and the precomputed coverage index."""
+import os
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+WORKSHOPS_FILE = os.path.join(DATA_DIR, "KMA_Mahindra_Workshops_Lat_Long.xlsx")
+NRC_FILE = os.path.join(DATA_DIR, "KMA_NRC_F30_Retail_RO_Projections_PV_Lat_Long_Pincode.xlsx")
+
+# Written by precompute.py, memory-mapped by the app
+INDEX_DIST_SQ_FILE = os.path.join(DATA_DIR, "coverage_dist_sq_sorted.npy")
+INDEX_CUM_VINS_FILE = os.path.join(DATA_DIR, "coverage_cum_vins.npy")
+INDEX_FINGERPRINT_FILE = os.path.join(DATA_DIR, "coverage_index.sha256")
+
+WORKSHOP_COLUMNS = {"workshop name", "pincode", "lat", "lon"}
+NRC_COLUMNS = {
+    "customer pin code", "latitude", "longitude", "nrc vin count", "nrc_projected_ro_yearly",
+}
+
+# Alternative (already lower-cased) headers seen in the workbooks, mapped to
+# the names the app uses
+WORKSHOP_ALIASES = {
+    "mahindra workshop location": "workshop name",
+    "mabindra workshop location": "workshop name",
+    "workshop pincode": "pincode",
+    "latitude": "lat",
+    "longitude": "lon",
+}
+NRC_ALIASES = {
+    "pincode": "customer pin code",
+    "customer pincode": "customer pin code",
+    "lat": "latitude",
+    "lon": "longitude",
+}
+
+
+def canonicalize_columns(df, aliases):
+    """Strip and lower-case headers in one pass, renaming known aliases."""
+    df.columns = [aliases.get(c, c) for c in df.columns.astype(str).str.strip().str.lower()]
+    return df
+
+
+def coerce_dtypes(workshops, nrc):
+    """Narrow the numeric columns in place, dropping rows without coordinates.
+
+    Coordinates only need ~1 m precision and VIN counts fit in int32; the
+    narrower dtypes halve what the distance kernels have to stream.
+    """
+    for df, coord_cols in ((workshops, ["lat", "lon"]), (nrc, ["latitude", "longitude"])):
+        coord_cols = [c for c in coord_cols if c in df.columns]
+        df[coord_cols] = df[coord_cols].apply(pd.to_numeric, errors="coerce").astype(np.float32)
+        df.dropna(subset=coord_cols, inplace=True)
+    if "nrc vin count" in nrc.columns:
+        nrc["nrc vin count"] = (
+            pd.to_numeric(nrc["nrc vin count"], errors="coerce").fillna(0).astype(np.int32)
+        )
+    return workshops, nrc
+
+
+def read_workbooks():
+    """Read both workbooks with normalized headers and compact numeric dtypes."""
+    workshops = pd.read_excel(WORKSHOPS_FILE, engine="calamine")
+    nrc = pd.read_excel(NRC_FILE, engine="calamine")
+
+    canonicalize_columns(workshops, WORKSHOP_ALIASES)
+    canonicalize_columns(nrc, NRC_ALIASES)
+    return coerce_dtypes(workshops, nrc)
+
+
+def save_coverage_index(dist_sq_sorted, cum_vins, fingerprint):
+    np.save(INDEX_DIST_SQ_FILE, dist_sq_sorted.astype(np.float32))
+    np.save(INDEX_CUM_VINS_FILE, cum_vins)
+    with open(INDEX_FINGERPRINT_FILE, "w") as f:
+        f.write(fingerprint)
+
+
+def load_saved_coverage_index():
+    """Memory-map the saved coverage index with its input fingerprint.
+
+    Returns ``(dist_sq_sorted, cum_vins, fingerprint)``, or None if the index was
+    never built.
+    """
+    paths = (INDEX_DIST_SQ_FILE, INDEX_CUM_VINS_FILE, INDEX_FINGERPRINT_FILE)
+    if not all(os.path.exists(p) for p in paths):
+        return None
+    with open(INDEX_FINGERPRINT_FILE) as f:
+        fingerprint = f.read().strip()
+    return (
+        np.load(INDEX_DIST_SQ_FILE, mmap_mode="r"),
+        np.load(INDEX_CUM_VINS_FILE, mmap_mode="r"),
+        fingerprint,
+    )
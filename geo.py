@@ -0,0 +1,170 @@
+"""Distance helpers for counting NRC VINs around each workshop."""
+import hashlib
+from math import cos, radians
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; callers check ``totals_within_radius is None``
+    njit = None
+
+try:
+    from coverage_kernel import totals_within_c
+except ImportError:  # built separately with ``python setup.py build_ext --inplace``
+    totals_within_c = None
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON = 111.320
+
+# NRC points per block in the chunked NumPy fallback
+NRC_CHUNK_SIZE = 10_000
+
+
+def projection_origin(lat, lon):
+    """Mean ``(lat, lon)`` in degrees, the centre of the :func:`project_km` plane."""
+    return float(np.mean(lat)), float(np.mean(lon))
+
+
+def project_km(lat, lon, origin):
+    """Equirectangular projection of degree coordinates onto a local km plane.
+
+    ``origin`` is the ``(lat, lon)`` of the plane's centre, normally
+    :func:`projection_origin` of the workshops. Centring keeps float32
+    coordinates within a few hundred km of zero, where they resolve well
+    under a metre; absolute longitudes (~8,000 km) only resolve to ~1 m and
+    points sitting on the radius land on different sides of it depending on
+    how each backend rounds. Over the 1–20 km radii used here the error
+    against the true geodesic distance is far below the slider's 1 km step.
+    """
+    lat0, lon0 = origin
+    # Python-float scale factors keep float32 inputs in float32
+    kx = cos(radians(lat0)) * KM_PER_DEG_LON
+    return np.column_stack(((lon - lon0) * kx, (lat - lat0) * KM_PER_DEG_LAT))
+
+
+def squared_distance_matrix_km(xy1, xy2):
+    """Squared distance (km²) between every pair of :func:`project_km` points.
+
+    This is exactly the arithmetic the compiled kernels and the box-prefiltered
+    scan do per pair, so a dense lookup and a kernel return the same totals
+    down to the points lying on the radius.
+    """
+    dx = xy2[None, :, 0] - xy1[:, None, 0]
+    dy = xy2[None, :, 1] - xy1[:, None, 1]
+    return dx * dx + dy * dy
+
+
+def build_coverage_index(dist_sq_km, vins):
+    """Per-workshop squared NRC distances in ascending order with the running VIN total.
+
+    ``cum_vins[i, k]`` is the number of VINs among the ``k`` NRC points nearest
+    to workshop ``i``, so any radius is answered by :func:`totals_within`.
+    """
+    order = np.argsort(dist_sq_km, axis=1)
+    dist_sq_sorted = np.take_along_axis(dist_sq_km, order, axis=1)
+    cum_vins = np.zeros((dist_sq_km.shape[0], dist_sq_km.shape[1] + 1), dtype=np.int64)
+    np.cumsum(vins[order], axis=1, out=cum_vins[:, 1:])
+    return dist_sq_sorted, cum_vins
+
+
+def totals_within(dist_sq_sorted, cum_vins, radius_km):
+    """VIN total within ``radius_km`` of each workshop from a coverage index.
+
+    One binary search per workshop row, O(W log P), so only a handful of
+    entries of a memory-mapped index are ever touched.
+    """
+    r2 = radius_km * radius_km
+    n_within = np.fromiter(
+        (np.searchsorted(row, r2, side="right") for row in dist_sq_sorted),
+        dtype=np.intp,
+        count=len(dist_sq_sorted),
+    )
+    return cum_vins[np.arange(len(cum_vins)), n_within]
+
+
+def squared_distance_pairs_km(ws_xy, nrc_xy, rows, cols):
+    """Squared distance (km²) between ``ws_xy[rows]`` and ``nrc_xy[cols]``, pairwise."""
+    dx = nrc_xy[cols, 0] - ws_xy[rows, 0]
+    dy = nrc_xy[cols, 1] - ws_xy[rows, 1]
+    return dx * dx + dy * dy
+
+
+def coverage_fingerprint(ws_lat, ws_lon, nrc_lat, nrc_lon, vins):
+    """SHA-256 over the exact input arrays a coverage index is built from."""
+    digest = hashlib.sha256()
+    for arr in (ws_lat, ws_lon, nrc_lat, nrc_lon, vins):
+        arr = np.ascontiguousarray(arr)
+        digest.update(f"{arr.dtype.str}{arr.shape}".encode())
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+def coverage_index_matches(
+    dist_sq_sorted, cum_vins, fingerprint, ws_lat, ws_lon, nrc_lat, nrc_lon, vins
+):
+    """Check that a saved coverage index was built from exactly this data.
+
+    Any edit to a workshop location, an NRC location or a VIN count changes
+    :func:`coverage_fingerprint`, so the index is rebuilt instead of serving
+    stale totals.
+    """
+    n_ws, n_nrc = len(ws_lat), len(nrc_lat)
+    if dist_sq_sorted.shape != (n_ws, n_nrc) or cum_vins.shape != (n_ws, n_nrc + 1):
+        return False
+    return fingerprint == coverage_fingerprint(ws_lat, ws_lon, nrc_lat, nrc_lon, vins)
+
+
+def totals_within_bbox(ws_xy, nrc_xy, vins, radius_km, chunk_size=NRC_CHUNK_SIZE):
+    """Sum of ``vins`` within ``radius_km`` of each workshop, box-prefiltered.
+
+    Takes :func:`project_km` coordinates. A cheap ``|dx|, |dy| <= r`` test
+    discards the bulk of far-away pairs first, so the exact distance is only
+    evaluated for the few candidates inside each workshop's bounding box.
+    NRC points are processed ``chunk_size`` at a time, keeping peak memory at
+    O(workshops x chunk_size) instead of O(workshops x NRC points).
+    """
+    totals = np.zeros(ws_xy.shape[0], dtype=np.int64)
+    for start in range(0, nrc_xy.shape[0], chunk_size):
+        chunk_xy = nrc_xy[start:start + chunk_size]
+        dx = chunk_xy[None, :, 0] - ws_xy[:, None, 0]
+        dy = chunk_xy[None, :, 1] - ws_xy[:, None, 1]
+        rows, cols = np.nonzero((np.abs(dx) <= radius_km) & (np.abs(dy) <= radius_km))
+        dx, dy = dx[rows, cols], dy[rows, cols]
+        hit = dx * dx + dy * dy <= radius_km * radius_km
+        totals += np.bincount(
+            rows[hit], weights=vins[start + cols[hit]], minlength=ws_xy.shape[0]
+        ).astype(np.int64)
+    return totals
+
+
+if njit is not None:
+    # fastmath minus "contract": a fused multiply-add rounds d² differently
+    # from the NumPy paths and flips points sitting exactly on the radius
+    @njit(parallel=True, fastmath={"nnan", "ninf", "nsz", "arcp", "afn"}, cache=True)
+    def totals_within_radius(ws_xy, nrc_xy, vins, radius_km):
+        """Sum of ``vins`` within ``radius_km`` of each workshop.
+
+        Takes :func:`project_km` coordinates, runs in parallel over workshops
+        and never allocates the workshops x NRC points distance matrix.
+        """
+        n_ws, n_nrc = ws_xy.shape[0], nrc_xy.shape[0]
+        out = np.zeros(n_ws, dtype=np.int64)
+        r2 = radius_km * radius_km
+        for i in prange(n_ws):
+            s = 0
+            for j in range(n_nrc):
+                dx = nrc_xy[j, 0] - ws_xy[i, 0]
+                dy = nrc_xy[j, 1] - ws_xy[i, 1]
+                if dx * dx + dy * dy <= r2:
+                    s += vins[j]
+            out[i] = s
+        return out
+
+    # Compile once at app start (or load from numba's on-disk cache) so the
+    # first slider query doesn't pay for it, using the float32/int32 columns
+    # the app loads
+    _z = np.zeros((1, 2), dtype=np.float32)
+    totals_within_radius(_z, _z, np.zeros(1, dtype=np.int32), 1.0)
+else:
+    totals_within_radius = None
@@ -0,0 +1,45 @@
+"""Build the coverage index offline so the app can memory-map it at startup.
+
+Run again whenever the workbooks in ``data/`` change::
+
+    python precompute.py
+
+The app checks the saved index against the current data and falls back to
+computing it in-process if it is stale.
+"""
+from data import (
+    INDEX_CUM_VINS_FILE,
+    INDEX_DIST_SQ_FILE,
+    INDEX_FINGERPRINT_FILE,
+    read_workbooks,
+    save_coverage_index,
+)
+from geo import (
+    build_coverage_index,
+    coverage_fingerprint,
+    project_km,
+    projection_origin,
+    squared_distance_matrix_km,
+)
+
+
+def main():
+    workshops, nrc = read_workbooks()
+    ws_lat, ws_lon = workshops["lat"].to_numpy(), workshops["lon"].to_numpy()
+    nrc_lat, nrc_lon = nrc["latitude"].to_numpy(), nrc["longitude"].to_numpy()
+    vins = nrc["nrc vin count"].to_numpy()
+    origin = projection_origin(ws_lat, ws_lon)
+
+    dist_sq_km = squared_distance_matrix_km(
+        project_km(ws_lat, ws_lon, origin), project_km(nrc_lat, nrc_lon, origin)
+    )
+    dist_sq_sorted, cum_vins = build_coverage_index(dist_sq_km, vins)
+    save_coverage_index(
+        dist_sq_sorted, cum_vins, coverage_fingerprint(ws_lat, ws_lon, nrc_lat, nrc_lon, vins)
+    )
+    print(f"Wrote {INDEX_DIST_SQ_FILE}, {INDEX_CUM_VINS_FILE} and {INDEX_FINGERPRINT_FILE} for "
+          f"{len(workshops)} workshops x {len(nrc)} NRC points")
+
+
+if __name__ == "__main__":
+    main()
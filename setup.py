@@ -0,0 +1,20 @@
+"""Builds the optional OpenMP coverage kernel: python setup.py build_ext --inplace"""
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+setup(
+    name="nrc-coverage-kernel",
+    ext_modules=cythonize(
+        [
+            Extension(
+                "coverage_kernel",
+                ["coverage_kernel.pyx"],
+                # No FMA contraction, so d² rounds exactly like the NumPy paths
+                extra_compile_args=[
+                    "-O3", "-march=native", "-fopenmp", "-ffast-math", "-ffp-contract=off"
+                ],
+                extra_link_args=["-fopenmp"],
+            )
+        ]
+    ),
+)
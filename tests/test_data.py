@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import (
+    NRC_ALIASES,
+    NRC_COLUMNS,
+    WORKSHOP_ALIASES,
+    WORKSHOP_COLUMNS,
+    canonicalize_columns,
+    coerce_dtypes,
+)
+
+
+def make_frames():
+    workshops = pd.DataFrame({
+        "workshop name": ["A", "B", "C"],
+        "pincode": [700001, 700002, 700003],
+        "lat": ["22.57", "bad", 22.61],
+        "lon": [88.36, 88.40, None],
+    })
+    nrc = pd.DataFrame({
+        "customer pin code": [700010, 700011, 700012, 700013],
+        "latitude": [22.50, 22.55, None, 22.65],
+        "longitude": [88.30, "88.35", 88.40, 88.45],
+        "nrc vin count": [12, None, 7, "n/a"],
+        "nrc_projected_ro_yearly": [1.5, 2.0, 0.5, 3.0],
+    })
+    return workshops, nrc
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("Mahindra Workshop Location", "workshop name"),
+        # Misspelling found in one of the workbooks
+        ("mabindra workshop location", "workshop name"),
+        (" Workshop Pincode ", "pincode"),
+        ("LATITUDE", "lat"),
+        ("Longitude", "lon"),
+        ("Workshop Name", "workshop name"),
+    ],
+)
+def test_workshop_headers_canonicalize(header, expected):
+    df = canonicalize_columns(pd.DataFrame(columns=[header]), WORKSHOP_ALIASES)
+    assert list(df.columns) == [expected]
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("Pincode", "customer pin code"),
+        ("Customer Pincode", "customer pin code"),
+        (" lat", "latitude"),
+        ("LON", "longitude"),
+        ("NRC VIN Count", "nrc vin count"),
+    ],
+)
+def test_nrc_headers_canonicalize(header, expected):
+    df = canonicalize_columns(pd.DataFrame(columns=[header]), NRC_ALIASES)
+    assert list(df.columns) == [expected]
+
+
+def test_canonical_headers_cover_required_columns():
+    ws_headers = ["Mabindra Workshop Location", "Workshop Pincode", "Latitude", "Longitude"]
+    nrc_headers = ["Pincode", "Lat", "Lon", "NRC VIN Count", "NRC_Projected_RO_Yearly"]
+    workshops = canonicalize_columns(pd.DataFrame(columns=ws_headers), WORKSHOP_ALIASES)
+    nrc = canonicalize_columns(pd.DataFrame(columns=nrc_headers), NRC_ALIASES)
+    assert set(workshops.columns) == WORKSHOP_COLUMNS
+    assert set(nrc.columns) == NRC_COLUMNS
+
+
+def test_coerce_dtypes_narrows_numeric_columns():
+    workshops, nrc = coerce_dtypes(*make_frames())
+    assert workshops[["lat", "lon"]].dtypes.tolist() == [np.float32, np.float32]
+    assert nrc[["latitude", "longitude"]].dtypes.tolist() == [np.float32, np.float32]
+    assert nrc["nrc vin count"].dtype == np.int32
+
+
+def test_coerce_dtypes_drops_rows_without_coordinates():
+    workshops, nrc = coerce_dtypes(*make_frames())
+    assert workshops["workshop name"].tolist() == ["A"]
+    assert nrc["customer pin code"].tolist() == [700010, 700011, 700013]
+    assert nrc["longitude"].tolist() == pytest.approx([88.30, 88.35, 88.45])
+
+
+def test_coerce_dtypes_counts_unparseable_vins_as_zero():
+    _, nrc = coerce_dtypes(*make_frames())
+    assert nrc["nrc vin count"].tolist() == [12, 0, 0]
@@ -0,0 +1,147 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from geo import (
+    build_coverage_index,
+    coverage_fingerprint,
+    coverage_index_matches,
+    project_km,
+    projection_origin,
+    squared_distance_matrix_km,
+    totals_within,
+    totals_within_bbox,
+    totals_within_c,
+    totals_within_radius,
+)
+
+ORIGIN = (22.6, 88.4)
+RADII_KM = range(1, 21)
+
+
+def make_layout(seed, n_ws=12, n_nrc=400):
+    """Random workshops/NRC points over the KMA region, in the dtypes the app loads."""
+    rng = np.random.default_rng(seed)
+    layout = SimpleNamespace(
+        ws_lat=rng.uniform(22.3, 22.9, n_ws).astype(np.float32),
+        ws_lon=rng.uniform(88.1, 88.7, n_ws).astype(np.float32),
+        nrc_lat=rng.uniform(22.3, 22.9, n_nrc).astype(np.float32),
+        nrc_lon=rng.uniform(88.1, 88.7, n_nrc).astype(np.float32),
+        vins=rng.integers(0, 500, n_nrc).astype(np.int32),
+    )
+    origin = projection_origin(layout.ws_lat, layout.ws_lon)
+    layout.ws_xy = project_km(layout.ws_lat, layout.ws_lon, origin)
+    layout.nrc_xy = project_km(layout.nrc_lat, layout.nrc_lon, origin)
+    layout.dist_sq = squared_distance_matrix_km(layout.ws_xy, layout.nrc_xy)
+    return layout
+
+
+@pytest.fixture(params=[0, 1, 2])
+def layout(request):
+    return make_layout(request.param)
+
+
+def dense_totals(layout, radius_km):
+    return (layout.dist_sq <= radius_km ** 2) @ layout.vins
+
+
+def _coverage_index(layout, radius_km):
+    return totals_within(*build_coverage_index(layout.dist_sq, layout.vins), radius_km)
+
+
+def _bbox(layout, radius_km):
+    return totals_within_bbox(layout.ws_xy, layout.nrc_xy, layout.vins, radius_km)
+
+
+def _bbox_chunked(layout, radius_km):
+    return totals_within_bbox(layout.ws_xy, layout.nrc_xy, layout.vins, radius_km, chunk_size=64)
+
+
+def _numba(layout, radius_km):
+    return totals_within_radius(layout.ws_xy, layout.nrc_xy, layout.vins, float(radius_km))
+
+
+def _c(layout, radius_km):
+    return totals_within_c(layout.ws_xy, layout.nrc_xy, layout.vins, float(radius_km))
+
+
+BACKENDS = [
+    pytest.param(_coverage_index, id="coverage_index"),
+    pytest.param(_bbox, id="bbox"),
+    pytest.param(_bbox_chunked, id="bbox_chunked"),
+    pytest.param(
+        _numba, id="numba",
+        marks=pytest.mark.skipif(totals_within_radius is None, reason="numba not installed"),
+    ),
+    pytest.param(
+        _c, id="c",
+        marks=pytest.mark.skipif(
+            totals_within_c is None, reason="coverage_kernel extension not built"
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "ws, pt, geodesic_km",
+    [
+        # Reference distances from geopy.distance.geodesic (WGS-84)
+        ((22.6, 88.4), (22.7, 88.4), 11.0739),
+        ((22.6, 88.4), (22.6, 88.5), 10.2822),
+        ((22.57, 88.36), (22.65, 88.45), 12.8104),
+    ],
+)
+def test_squared_distance_matches_geodesic(ws, pt, geodesic_km):
+    d2 = squared_distance_matrix_km(
+        project_km(np.array([ws[0]]), np.array([ws[1]]), ORIGIN),
+        project_km(np.array([pt[0]]), np.array([pt[1]]), ORIGIN),
+    )
+    assert d2.shape == (1, 1)
+    assert np.sqrt(d2[0, 0]) == pytest.approx(geodesic_km, rel=5e-3)
+
+
+def test_projection_is_centred_on_origin(layout):
+    origin = projection_origin(layout.ws_lat, layout.ws_lon)
+    np.testing.assert_allclose(layout.ws_xy.mean(axis=0), 0, atol=1e-3)
+    assert project_km(np.array([origin[0]]), np.array([origin[1]]), origin).tolist() == [[0, 0]]
+
+
+def test_float32_inputs_stay_float32(layout):
+    assert layout.ws_xy.dtype == np.float32
+    assert layout.dist_sq.dtype == np.float32
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_matches_dense(layout, backend):
+    for radius_km in RADII_KM:
+        np.testing.assert_array_equal(backend(layout, radius_km), dense_totals(layout, radius_km))
+
+
+def test_coverage_index_counts_points_on_the_radius():
+    dist_sq = np.array([[1.0, 4.0, 4.0, 9.0]], dtype=np.float32)
+    vins = np.array([1, 10, 100, 1000], dtype=np.int32)
+    index = build_coverage_index(dist_sq, vins)
+    assert totals_within(*index, 2).tolist() == [111]
+    assert totals_within(*index, 0.5).tolist() == [0]
+
+
+def test_saved_index_check_detects_changed_data():
+    layout = make_layout(4)
+    arrays = (layout.ws_lat, layout.ws_lon, layout.nrc_lat, layout.nrc_lon, layout.vins)
+    saved = (*build_coverage_index(layout.dist_sq, layout.vins), coverage_fingerprint(*arrays))
+
+    assert coverage_index_matches(*saved, *arrays)
+
+    moved_lat = layout.ws_lat.copy()
+    moved_lat[5] += 0.05  # a middle workshop moves ~5.5 km
+    assert not coverage_index_matches(*saved, moved_lat, *arrays[1:])
+
+    swapped = layout.vins.copy()
+    swapped[[3, 7]] = swapped[[7, 3]]  # VINs move between pincodes, total unchanged
+    assert swapped[3] != swapped[7]
+    assert not coverage_index_matches(*saved, *arrays[:4], swapped)
+
+    assert not coverage_index_matches(
+        *saved, layout.ws_lat[:-1], layout.ws_lon[:-1], *arrays[2:]
+    )